@@ -0,0 +1,103 @@
+"""Compiled digit extraction and dataset caching for the synthetic-data test scripts.
+
+Run ``python backend/_fastloops.py`` once to AOT-compile the kernel into the
+``fastloops`` extension module next to this file. Scripts import that module
+when it exists and fall back to the disk-cached ``@njit`` version below, so
+neither path pays JIT warmup after the first run.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import tempfile
+import numpy as np
+
+from _njit import njit
+
+DIGITS_FROM_PRICES_SIG = 'i8[:](f8[:], i8)'
+
+
+def _digits_from_prices(prices, scale):
+    """Last quoted digit of each price for a given decimal scale"""
+    out = np.empty(prices.shape[0], dtype=np.int64)
+    for i in range(prices.shape[0]):
+        out[i] = np.int64(np.rint(prices[i] * scale)) % 10
+    return out
+
+
+def _code_digest(funcs, params):
+    """Short hash of the functions' bytecode, constants and the given parameter values"""
+    h = hashlib.sha1()
+    for func in funcs:
+        # Compiled dispatchers keep the Python source function as py_func
+        code = getattr(func, 'py_func', func).__code__
+        # Nested code objects repr with their address, so only plain constants are hashed
+        consts = [c for c in code.co_consts if not hasattr(c, 'co_code')]
+        h.update(code.co_code)
+        h.update(repr((consts, code.co_names)).encode())
+    h.update(repr(params).encode())
+    return h.hexdigest()[:12]
+
+
+def npz_cache(cache_dir, seed=None, params=(), helpers=()):
+    """Cache a (digits, prices) generator on disk keyed on its arguments, code and params.
+
+    The key includes a hash of the bytecode and constants of the generator,
+    of the helpers it calls (such as its RNG factory) and of the digit kernel,
+    plus params (module-level values it reads, such as the price scale), so
+    editing any of them invalidates its datasets. Arguments are bound to the
+    generator's signature, so defaults and keyword arguments map to the same
+    key as their positional spelling. When seed is given the global RNG is
+    reseeded before each miss, so a given key always maps to the same dataset
+    regardless of call order; generators with their own RNG pass none.
+    """
+    def decorator(func):
+        digest = _code_digest((func, _digits_from_prices) + tuple(helpers), (seed,) + tuple(params))
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = '_'.join(str(value) for value in bound.arguments.values())
+            path = os.path.join(cache_dir, f"{func.__name__}_{key}_{digest}.npz")
+
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    return data['digits'], data['prices']
+
+            if seed is not None:
+                np.random.seed(seed)
+            digits, prices = func(*args, **kwargs)
+            # Write to a temporary file and rename it into place, so a concurrent
+            # or interrupted run never sees a partial archive
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.savez(f, digits=digits, prices=prices)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            return digits, prices
+        return wrapper
+    return decorator
+
+
+if __name__ != "__main__":
+    # Skipped when building: the JIT cache is keyed on the importing module's name
+    digits_from_prices = njit(DIGITS_FROM_PRICES_SIG, cache=True, boundscheck=False, fastmath=True)(_digits_from_prices)
+else:
+    # numba.pycc is only needed (and only warns about its deprecation) when building
+    try:
+        from numba.pycc import CC
+    except ImportError:
+        raise SystemExit("numba is required to build the fastloops module")
+
+    cc = CC('fastloops')
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export('digits_from_prices', DIGITS_FROM_PRICES_SIG)(_digits_from_prices)
+    cc.compile()
+    print(f"✅ Built fastloops in {cc.output_dir}")
@@ -0,0 +1,27 @@
+/* Most frequent digit in a window of last digits, for UltraConservative.
+ *
+ * Built into libhotdigit.so by _hotdigit.py on first import and called through
+ * ctypes. Ties are broken by earliest appearance in the window, matching the
+ * pure-Python fallback.
+ */
+#include <stdint.h>
+
+int hottest_digit(const uint8_t *buf, int n, int *out_freq)
+{
+    uint32_t hist[10] = {0};
+    uint32_t best = 0;
+    int i;
+
+    /* No ivdep here: repeated digits hit the same bin, a real loop-carried dependency */
+    for (i = 0; i < n; i++)
+        hist[buf[i]]++;
+
+    for (i = 0; i < 10; i++)
+        best = hist[i] > best ? hist[i] : best;
+
+    *out_freq = (int)best;
+    for (i = 0; i < n; i++)
+        if (hist[buf[i]] == best)
+            return buf[i];
+    return -1;
+}
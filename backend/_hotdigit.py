@@ -0,0 +1,43 @@
+"""ctypes loader for the hottest_digit kernel in _hotdigit.c.
+
+The shared library is compiled next to this file with the system C compiler
+on first import, and rebuilt whenever the source is newer. ``hottest_digit``
+is None when it cannot be built or loaded, so callers keep a Python fallback.
+"""
+
+import ctypes
+import os
+import subprocess
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+_SOURCE = os.path.join(_DIR, "_hotdigit.c")
+_LIBRARY = os.path.join(_DIR, "libhotdigit.so")
+
+
+def _build():
+    """Compile _hotdigit.c for the host CPU"""
+    compiler = os.environ.get("CC", "gcc")
+    subprocess.run(
+        [compiler, "-O3", "-march=native", "-shared", "-fPIC", "-o", _LIBRARY, _SOURCE],
+        check=True,
+        capture_output=True,
+    )
+
+
+def _load():
+    """Build if needed and return the typed C function, or None"""
+    try:
+        if not os.path.exists(_LIBRARY) or os.path.getmtime(_LIBRARY) < os.path.getmtime(_SOURCE):
+            _build()
+        lib = ctypes.CDLL(_LIBRARY)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    func = lib.hottest_digit
+    func.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.POINTER(ctypes.c_int)]
+    func.restype = ctypes.c_int
+    return func
+
+
+# hottest_digit(window: bytes, n: int, byref(freq)) -> digit
+hottest_digit = _load()
@@ -0,0 +1,14 @@
+"""numba's ``njit`` when installed, otherwise a no-op decorator.
+
+Kernels written for numba are plain Python loops, so they still run (slowly)
+without it.
+"""
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in when numba is not installed"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
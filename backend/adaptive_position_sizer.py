@@ -29,47 +29,48 @@ class AdaptivePositionSizer:
 
     def calculate_optimal_position(self, balance, confidence, volatility, market_regime='normal'):
         """Calculate optimal position size based on multiple factors"""
+        return float(self.calculate_optimal_position_batch(
+            [balance], [confidence], [volatility], [market_regime]
+        )[0])
+
+    def calculate_optimal_position_batch(self, balances, confidences, volatilities, market_regimes):
+        """Optimal position sizes for parallel arrays of scenarios"""
+        balances = np.asarray(balances, dtype=np.float64)
+        confidences = np.asarray(confidences, dtype=np.float64)
+        volatilities = np.asarray(volatilities, dtype=np.float64)
 
         # Base position from Kelly Criterion approximation
-        kelly_position = self._calculate_kelly_position(balance, confidence)
+        kelly_position = self._calculate_kelly_position(balances, confidences)
 
         # Apply volatility adjustment
-        volatility_adjustment = self._calculate_volatility_adjustment(volatility)
+        volatility_adjustment = self._calculate_volatility_adjustment(volatilities)
 
         # Apply market regime adjustment
-        regime_adjustment = self._calculate_regime_adjustment(market_regime)
+        regime_adjustment = np.array([self._calculate_regime_adjustment(regime) for regime in market_regimes])
 
         # Apply performance adjustment
         performance_adjustment = self._calculate_performance_adjustment()
 
         # Apply confidence adjustment
-        confidence_adjustment = self._calculate_confidence_adjustment(confidence)
+        confidence_adjustment = self._calculate_confidence_adjustment(confidences)
 
         # Calculate final position
         final_position = (kelly_position *
-                         volatility_adjustment *
-                         regime_adjustment *
-                         performance_adjustment *
-                         confidence_adjustment)
+                          volatility_adjustment *
+                          regime_adjustment *
+                          performance_adjustment *
+                          confidence_adjustment)
 
         # Apply balance limits
-        max_position = min(
-            balance * self.max_position_pct,
-            self.max_position_size
-        )
+        max_position = np.minimum(balances * self.max_position_pct, self.max_position_size)
+        final_position = np.maximum(np.minimum(final_position, max_position), self.min_position_size)
 
-        final_position = min(final_position, max_position)
-        final_position = max(final_position, self.min_position_size)
-
-        return round(final_position, 2)
+        return np.round(final_position, 2)
 
     def _calculate_kelly_position(self, balance, confidence):
-        """Calculate position size using Kelly Criterion approximation"""
-        if confidence < 55:
-            return 0  # Don't trade below 55% confidence
-
+        """Calculate position size using Kelly Criterion approximation (scalars or arrays)"""
         # Convert confidence to win probability
-        win_prob = min(confidence / 100, 0.85)  # Cap at 85%
+        win_prob = np.minimum(confidence / 100, 0.85)  # Cap at 85%
         loss_prob = 1 - win_prob
 
         # Kelly formula approximation for binary outcomes
@@ -78,20 +79,20 @@ class AdaptivePositionSizer:
         kelly_fraction = (payout_ratio * win_prob - loss_prob) / payout_ratio
 
         # Conservative Kelly (use half of calculated fraction)
-        conservative_kelly = max(0, min(kelly_fraction * 0.5, 0.02))  # Max 2% of balance
+        conservative_kelly = np.clip(kelly_fraction * 0.5, 0, 0.02)  # Max 2% of balance
 
-        return balance * conservative_kelly
+        # Don't trade below 55% confidence
+        return np.where(confidence < 55, 0, balance * conservative_kelly)
 
     def _calculate_volatility_adjustment(self, volatility):
-        """Adjust position size based on market volatility"""
-        if volatility < 0.0005:  # Low volatility
-            return 1.2  # Increase position
-        elif volatility < 0.001:  # Normal volatility
-            return 1.0  # Normal position
-        elif volatility < 0.002:  # High volatility
-            return 0.7  # Reduce position
-        else:  # Very high volatility
-            return 0.4  # Significantly reduce position
+        """Adjust position size based on market volatility (scalars or arrays)"""
+        return np.select(
+            [volatility < 0.0005,   # Low volatility: increase position
+             volatility < 0.001,    # Normal volatility: normal position
+             volatility < 0.002],   # High volatility: reduce position
+            [1.2, 1.0, 0.7],
+            default=0.4             # Very high volatility: significantly reduce position
+        )
 
     def _calculate_regime_adjustment(self, regime):
         """Adjust position size based on market regime"""
@@ -119,15 +120,14 @@ class AdaptivePositionSizer:
             return 1.0
 
     def _calculate_confidence_adjustment(self, confidence):
-        """Adjust position size based on prediction confidence"""
-        if confidence >= 85:
-            return 1.3   # High confidence = larger position
-        elif confidence >= 75:
-            return 1.1   # Good confidence = slightly larger position
-        elif confidence >= 65:
-            return 1.0   # Normal confidence = normal position
-        else:
-            return 0.8   # Lower confidence = smaller position
+        """Adjust position size based on prediction confidence (scalars or arrays)"""
+        return np.select(
+            [confidence >= 85,   # High confidence = larger position
+             confidence >= 75,   # Good confidence = slightly larger position
+             confidence >= 65],  # Normal confidence = normal position
+            [1.3, 1.1, 1.0],
+            default=0.8          # Lower confidence = smaller position
+        )
 
     def update_trade_result(self, stake, profit, confidence, strategy):
         """Update trade history and adjust parameters"""
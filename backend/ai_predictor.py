@@ -84,7 +84,7 @@ class DigitPredictor:
     
     def _fallback_prediction(self, recent_digits):
         """Fallback to frequency analysis if LSTM not ready"""
-        if not recent_digits:
+        if len(recent_digits) == 0:
             return {'predicted_digit': 5, 'confidence': 10.0, 'method': 'fallback'}
         
         counter = Counter(recent_digits[-50:])
@@ -92,7 +92,7 @@ class DigitPredictor:
         confidence = (most_common[1] / len(recent_digits[-50:])) * 100
         
         return {
-            'predicted_digit': most_common[0],
+            'predicted_digit': int(most_common[0]),
             'confidence': confidence,
             'method': 'frequency'
         }
@@ -126,19 +126,19 @@ class MarketAnalyzer:
     
     def multi_timeframe_analysis(self, digits):
         """Analyze patterns across different tick windows"""
-        if not digits:
+        if len(digits) == 0:
             return {'consensus_digit': 5, 'consensus_strength': 0, 'signals': {}}
         
         windows = [10, 20, 50, 100]
         signals = {}
         
         for window in windows:
-            recent = list(digits)[-window:] if len(digits) >= window else list(digits)
-            if recent:
+            recent = digits[-window:]
+            if len(recent):
                 counter = Counter(recent)
                 most_freq = counter.most_common(1)[0]
                 signals[f'tf_{window}'] = {
-                    'digit': most_freq[0],
+                    'digit': int(most_freq[0]),
                     'strength': most_freq[1] / len(recent),
                     'count': most_freq[1]
                 }
@@ -193,7 +193,7 @@ class MarketAnalyzer:
             'american': [6, 7, 8, 9]    # Higher digits
         }
         
-        if not digits:
+        if len(digits) == 0:
             return session_biases.get(session, [5])
         
         # Check if current pattern matches session bias
@@ -216,8 +216,11 @@ class EnhancedPredictor:
         self.prediction_history = []
         
     def get_comprehensive_prediction(self, digits, prices, balance, base_stake):
-        """Get comprehensive prediction combining all AI methods"""
-        if not digits or not prices:
+        """Get comprehensive prediction combining all AI methods.
+
+        digits and prices may be lists or 1-D ndarrays; they are only sliced (a view for ndarrays, a copy for lists).
+        """
+        if len(digits) == 0 or len(prices) == 0:
             return self._default_prediction()
         
         # 1. LSTM Prediction
@@ -0,0 +1,239 @@
+"""Shared, authorized Deriv WebSocket connections for the trading scripts.
+
+Strategies run in the same process (one after another, e.g. when comparing
+them) reuse one connection per API token instead of paying a TLS handshake
+and re-authorization each. A connection has a single reader at a time, so a
+script's tick loop sends requests with ``DerivClient.request``: it tags the
+frame with a ``req_id`` and hands every other frame that arrives meanwhile
+back to the loop instead of mistaking it for the reply.
+
+``FrameRouter`` is the alternative for scripts that own their connection:
+background writer and reader tasks, with replies matched to requests by
+``req_id`` so the tick loop never waits on a send.
+
+The module also holds what every trading script needs to speak the protocol:
+``loads``/``dumps`` (orjson when installed), pre-encoded request frames, the
+fixed DIGITDIFF trade parameters and quote parsing helpers.
+"""
+
+import asyncio
+
+import websockets
+
+try:
+    from orjson import loads, dumps as _orjson_dumps
+
+    def dumps(obj):
+        """JSON text for obj (str, so websockets sends a text frame)"""
+        return _orjson_dumps(obj).decode()
+except ImportError:
+    from json import loads, dumps
+
+# Fixed part of every R_100 one-tick DIFFERS trade; only stake and barrier change
+DIFFERS_PARAMETERS = {
+    "basis": "stake",
+    "contract_type": "DIGITDIFF",
+    "currency": "USD",
+    "duration": 1,
+    "duration_unit": "t",
+    "symbol": "R_100",
+}
+
+# Pre-encoded request frames; trades only interpolate (price, amount, barrier)
+DIFFERS_TRADE_TMPL = ('{"buy":1,"price":%.2f,"parameters":{"amount":%.2f,"basis":"stake",'
+                      '"contract_type":"DIGITDIFF","currency":"USD","duration":1,'
+                      '"duration_unit":"t","symbol":"R_100","barrier":"%d"}}')
+BALANCE_SUBSCRIBE = '{"balance":1,"subscribe":1}'
+TICKS_SUBSCRIBE = '{"ticks":"R_100","subscribe":1}'
+
+
+def scan_quote(message):
+    """Price of a tick frame read straight from the raw message, or None if it is not a plain tick"""
+    if isinstance(message, str):
+        message = message.encode()
+    if b'"tick"' not in message:
+        return None
+    start = message.find(b'"quote":')
+    if start < 0:
+        return None
+    start += 8
+    end = message.find(b',', start)
+    if end < 0:
+        end = message.find(b'}', start)
+    try:
+        return float(message[start:end])
+    except ValueError:
+        return None
+
+
+def price_scale(price, pip_size):
+    """10 ** pip_size for digit extraction, checked against the quote's formatted last digit"""
+    scale = 10 ** pip_size
+    digit = int(round(price * scale)) % 10
+    expected = int(f"{price:.{pip_size}f}"[-1])
+    assert digit == expected, f"Digit extraction mismatch for {price}: {digit} != {expected}"
+    return scale
+
+
+class DerivClient:
+    """Process-wide pool of authorized Deriv connections, keyed by API token"""
+
+    URL = "wss://ws.derivws.com/websockets/v3?app_id=1089"
+    _FORGET_ALL = '{"forget_all":["ticks","balance"]}'
+
+    _connections = {}
+    _connect_lock = None
+    _next_req_id = 1
+
+    @classmethod
+    async def get_connection(cls, token):
+        """Return the authorized connection for token, opening it on first use.
+
+        A reused connection has its tick and balance streams cancelled first so
+        the next strategy starts from a clean subscription state.
+        Raises ConnectionError when authorization is rejected.
+        """
+        if cls._connect_lock is None:
+            cls._connect_lock = asyncio.Lock()
+
+        async with cls._connect_lock:
+            ws = cls._connections.get(token)
+            if ws is not None and not getattr(ws, 'closed', False):
+                await cls._reset_subscriptions(ws)
+                return ws
+
+            ws = await websockets.connect(cls.URL, ping_interval=20, ping_timeout=10)
+            await ws.send(dumps({"authorize": token}))
+            auth_data = loads(await ws.recv())
+            if "error" in auth_data:
+                await ws.close()
+                raise ConnectionError(f"Authorization failed: {auth_data['error']}")
+
+            cls._connections[token] = ws
+            return ws
+
+    @classmethod
+    async def _reset_subscriptions(cls, ws):
+        """Cancel open streams and drop frames queued before the cancellation"""
+        await ws.send(cls._FORGET_ALL)
+        while loads(await ws.recv()).get("msg_type") != "forget_all":
+            pass
+
+    @classmethod
+    async def request(cls, ws, frame, deferred, **recv_kwargs):
+        """Send a pre-encoded JSON object tagged with a fresh req_id and return the decoded reply.
+
+        Frames received before the reply (ticks, balance updates) are appended
+        to deferred as they arrived, still encoded, for the caller's read loop.
+        """
+        req_id = cls._next_req_id
+        cls._next_req_id += 1
+        await ws.send(f'{frame[:-1]},"req_id":{req_id}}}')
+        while True:
+            message = await ws.recv(**recv_kwargs)
+            data = loads(message)
+            if data.get("req_id") == req_id:
+                return data
+            deferred.append(message)
+
+
+class FrameRouter:
+    """Writer and reader tasks for one connection.
+
+    Outgoing frames go through a queue drained by the writer task. The reader
+    task decodes every incoming frame, resolves the request whose ``req_id``
+    it echoes, and queues everything else (ticks, balance updates) for
+    ``recv``. Start it once the connection is authorized and subscribed.
+
+    The inbox is unbounded on purpose: the tick loop that consumes it also
+    awaits request replies, so a reader blocked on a full inbox could never
+    deliver the reply and both would wait forever.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self._send_q = asyncio.Queue()
+        self._inbox = asyncio.Queue()
+        self._pending = {}
+        self._next_req_id = 1
+        self._error = None
+        self._tasks = [
+            asyncio.create_task(self._writer()),
+            asyncio.create_task(self._reader()),
+        ]
+
+    def send(self, payload):
+        """Queue a message dict without waiting for the socket"""
+        self._send_q.put_nowait(dumps(payload))
+
+    async def request(self, payload):
+        """Send a message dict and wait for the reply carrying its req_id"""
+        if self._error is not None:
+            raise self._error
+        req_id = self._next_req_id
+        self._next_req_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = future
+        self.send({**payload, "req_id": req_id})
+        try:
+            return await future
+        finally:
+            self._pending.pop(req_id, None)
+
+    async def recv(self):
+        """Next decoded frame that is not a reply to a request"""
+        item = await self._inbox.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def drain(self, limit=64):
+        """Frames recv() would return right now, without waiting (at most limit)"""
+        frames = []
+        while len(frames) < limit and not self._inbox.empty():
+            item = self._inbox.get_nowait()
+            if isinstance(item, Exception):
+                # The reader has stopped, so this stays last; leave it for recv() to raise
+                self._inbox.put_nowait(item)
+                break
+            frames.append(item)
+        return frames
+
+    async def close(self):
+        """Stop the writer and reader tasks and wait for them to finish"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _fail(self, error):
+        """Connection lost: fail waiting and later requests, and surface the error to recv()"""
+        if self._error is not None:
+            return
+        self._error = error
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._inbox.put_nowait(error)
+
+    async def _writer(self):
+        try:
+            while True:
+                await self.ws.send(await self._send_q.get())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail(e)
+
+    async def _reader(self):
+        try:
+            while True:
+                data = loads(await self.ws.recv())
+                future = self._pending.get(data.get("req_id"))
+                if future is not None and not future.done():
+                    future.set_result(data)
+                else:
+                    self._inbox.put_nowait(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail(e)
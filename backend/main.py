@@ -178,6 +178,9 @@ class DerivAPIClient:
         self.ws = None
         self.is_connected = False
         self.balance = 0.0
+        self.balance_stream_id = None
+        self._next_req_id = 1
+        self._deferred_ticks = deque()
 
     async def connect(self):
         if not self.api_token:
@@ -185,6 +188,7 @@ class DerivAPIClient:
             return False
         try:
             self.ws = await websockets.connect(f"wss://ws.derivws.com/websockets/v3?app_id={self.app_id}")
+            self.balance_stream_id = None
             await self.ws.send(json.dumps({"authorize": self.api_token}))
             response = await self.ws.recv()
             data = json.loads(response)
@@ -194,9 +198,9 @@ class DerivAPIClient:
             self.is_connected = True
             logging.info("Connected to Deriv API successfully.")
 
-            # Get initial balance
+            # Get initial balance; the tick loop applies later stream updates
             try:
-                balance = await self.get_balance_with_retry()
+                balance = await self.subscribe_balance()
                 if balance is not None:
                     self.balance = balance
                     logging.info(f"Initial balance: ${balance}")
@@ -218,10 +222,15 @@ class DerivAPIClient:
         try:
             await self.ws.send(json.dumps({"ticks": symbol, "subscribe": 1}))
             while True:
+                # Ticks that arrived while a request waited for its reply come first
+                while self._deferred_ticks:
+                    yield self._deferred_ticks.popleft()
                 response = await self.ws.recv()
                 data = json.loads(response)
                 if "tick" in data:
                     yield data["tick"]
+                elif "balance" in data:
+                    self._handle_balance(data)
         except Exception as e:
             logging.error(f"Error getting ticks: {e}")
 
@@ -243,9 +252,7 @@ class DerivAPIClient:
             }
         }
         try:
-            await self.ws.send(json.dumps(proposal))
-            response = await self.ws.recv()
-            data = json.loads(response)
+            data = await self._request(proposal)
             if "error" in data:
                 logging.error(f"Trade error: {data['error']}")
                 return None
@@ -258,27 +265,53 @@ class DerivAPIClient:
         if not self.is_connected:
             await self.connect()
         try:
-            await self.ws.send(json.dumps({"balance": 1, "subscribe": 0}))
-            response = await self.ws.recv()
-            data = json.loads(response)
+            data = await self._request({"balance": 1, "subscribe": 0})
             if "balance" in data:
                 return data["balance"]["balance"]
         except Exception as e:
             logging.warning(f"Error getting balance: {e}")
         return None
 
-    async def get_balance_with_retry(self, max_retries=3):
-        """Get balance with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                balance = await self.get_balance()
-                if balance is not None:
-                    return balance
-            except Exception as e:
-                logging.warning(f"Balance fetch attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(1)  # Wait 1 second before retry
-        return None
+    async def _request(self, payload):
+        """Send a message dict tagged with a fresh req_id and return its reply.
+
+        Balance stream updates received meanwhile are applied, and ticks are
+        kept for get_ticks, so neither is mistaken for the reply.
+        """
+        req_id = self._next_req_id
+        self._next_req_id += 1
+        await self.ws.send(json.dumps({**payload, "req_id": req_id}))
+        while True:
+            data = json.loads(await self.ws.recv())
+            if data.get("req_id") == req_id:
+                return data
+            if "tick" in data:
+                self._deferred_ticks.append(data["tick"])
+            elif "balance" in data:
+                self._handle_balance(data)
+
+    async def subscribe_balance(self):
+        """Subscribe to the balance stream; returns the first balance, or None on error.
+
+        Only called from connect(), before the tick loop starts reading, so the
+        reply is read here. The tick loop applies every later update.
+        """
+        await self.ws.send(json.dumps({"balance": 1, "subscribe": 1}))
+        response = await self.ws.recv()
+        return self._handle_balance(json.loads(response))
+
+    def _handle_balance(self, data):
+        """Apply a balance stream message; returns the new balance, or None for an error frame"""
+        if "error" in data:
+            logging.warning(f"Balance stream error: {data['error']}")
+            return None
+        self.balance = data["balance"]["balance"]
+        self.balance_stream_id = data.get("subscription", {}).get("id", self.balance_stream_id)
+        return self.balance
+
+    async def current_balance(self):
+        """Latest balance from the stream subscribed in connect(); never touches the socket"""
+        return self.balance
 
     async def refresh_balance_once(self):
         """Get current balance without subscription"""
@@ -290,25 +323,11 @@ class DerivAPIClient:
     async def connect_and_subscribe_ticks(self):
         """Connect to Deriv API and start tick subscription"""
         if await self.connect():
-            # Start background task to process ticks
+            # Start background task to process ticks (and balance stream updates)
             asyncio.create_task(self._process_ticks())
-            # Start background task to refresh balance periodically
-            asyncio.create_task(self._refresh_balance_periodically())
             return True
         return False
 
-    async def _refresh_balance_periodically(self):
-        """Background task to refresh balance every 30 seconds"""
-        while self.is_connected:
-            try:
-                balance = await self.get_balance()
-                if balance is not None:
-                    self.balance = balance
-                    logging.info(f"Balance updated: ${balance}")
-            except Exception as e:
-                logging.warning(f"Failed to refresh balance: {e}")
-            await asyncio.sleep(30)  # Refresh every 30 seconds
-
     async def _process_ticks(self):
         """Background task to process incoming ticks"""
         retry_count = 0
@@ -525,7 +544,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 # refresh balance (non-blocking call but await here to provide latest)
                 try:
                     if deriv_client.api_token:
-                        balance = await deriv_client.get_balance_with_retry() or deriv_client.balance
+                        balance = await deriv_client.current_balance() or deriv_client.balance
                     else:
                         balance = deriv_client.balance or 1000  # Default demo balance
                 except Exception as e:
@@ -0,0 +1,19 @@
+"""Cached UTC hour for the trading scripts' session filters.
+
+Kept apart from tick_features so importing it compiles no kernels.
+"""
+
+import time
+
+_cached_hour = -1
+_hour_valid_until = 0.0
+
+
+def utc_hour():
+    """Current UTC hour, re-read from the clock at most once a minute"""
+    global _cached_hour, _hour_valid_until
+    now = time.time()
+    if now >= _hour_valid_until:
+        _cached_hour = time.gmtime(now).tm_hour
+        _hour_valid_until = (now // 60 + 1) * 60
+    return _cached_hour
@@ -0,0 +1,144 @@
+"""Tick ring buffers, running price statistics and the pattern kernel.
+
+Shared by the root trading scripts (ZeroLossSystem, UltraSafeWinner) so they
+extract digits, track volatility and score patterns the same way, and share
+one numba cache entry for the kernel. Run ``python compile_kernels.py`` to
+AOT-build the kernel; it is picked up here when present.
+"""
+
+import math
+
+import numpy as np
+
+from _njit import njit
+from deriv_client import price_scale
+
+SCORE_PATTERNS_SIG = 'Tuple((i8, i8))(i1[::1], i8)'
+
+
+def _score_patterns(buf, n):
+    """Score digits over the ring buffer (oldest first); returns (best_digit, strength)"""
+    size = min(n, buf.shape[0])
+    start = (n - size) % buf.shape[0]
+    digits = np.empty(size, dtype=np.int8)
+    for k in range(size):
+        digits[k] = buf[(start + k) % buf.shape[0]]
+
+    scores = np.zeros(10, dtype=np.int64)
+    counts = np.zeros(10, dtype=np.int32)
+
+    # 1. Strong repetition patterns: digits seen 4+ times in a 10-tick window
+    for k in range(min(10, size)):
+        counts[digits[k]] += 1
+    for i in range(size - 10):
+        for d in range(10):
+            if counts[d] >= 4:
+                scores[d] += counts[d] * 3
+        counts[digits[i]] -= 1
+        counts[digits[i + 10]] += 1
+
+    # 2. Fibonacci sequences: every earlier digit a with (a + digits[j]) % 10 == digits[j + 1]
+    # scores 5, so count the earlier digits once instead of rescanning them for each j
+    counts[:] = 0
+    for j in range(1, size - 3):
+        if j - 1 < size - 5:
+            counts[digits[j - 1]] += 1
+        fib_next = digits[j + 1]
+        scores[fib_next] += 5 * counts[(fib_next - digits[j]) % 10]
+
+    # 3. Alternating patterns
+    for i in range(size - 6):
+        if (digits[i] == digits[i + 2] and digits[i + 2] == digits[i + 4] and
+                digits[i + 1] == digits[i + 3] and digits[i + 3] == digits[i + 5]):
+            scores[digits[i]] += 4
+            scores[digits[i + 1]] += 4
+
+    # 4. Recent dominance: 6+ of the last 20, first-seen digit wins ties
+    recent = max(size - 20, 0)
+    counts[:] = 0
+    for k in range(recent, size):
+        counts[digits[k]] += 1
+    max_count = 0
+    for d in range(10):
+        if counts[d] > max_count:
+            max_count = counts[d]
+    if max_count >= 6:
+        for k in range(recent, size):
+            if counts[digits[k]] == max_count:
+                scores[digits[k]] += 6
+                break
+
+    best_digit = 0
+    for d in range(1, 10):
+        if scores[d] > scores[best_digit]:
+            best_digit = d
+    return best_digit, scores[best_digit]
+
+
+try:
+    # Ahead-of-time build from compile_kernels.py: no JIT compile at start-up
+    from zero_loss_kernels import score_patterns
+except ImportError:
+    # Explicit signature: compiled (and disk-cached) at import, no type inference per call
+    score_patterns = njit(SCORE_PATTERNS_SIG, cache=True)(_score_patterns)
+
+
+class FeatureState:
+    """Ring buffers of the last history ticks plus running stats of the last window prices"""
+
+    __slots__ = ('digits', 'prices', 'n', 'window_mean', '_idx', '_window', '_win_m2', '_price_scale')
+
+    def __init__(self, history, window):
+        self.digits = np.zeros(history, dtype=np.int8)
+        self.prices = np.zeros(history, dtype=np.float64)
+        # Ticks pushed so far; _idx is the next write slot
+        self.n = 0
+        self._idx = 0
+        self._window = window
+        # Running mean and sum of squared deviations of the last window prices
+        self.window_mean = 0.0
+        self._win_m2 = 0.0
+        # 10 ** pip_size of the quote, fixed from the first tick
+        self._price_scale = None
+
+    def digit(self, price, pip_size):
+        """Last quoted digit of price; the first call fixes the scale from pip_size"""
+        if self._price_scale is None:
+            self._price_scale = price_scale(price, pip_size)
+        return int(round(price * self._price_scale)) % 10
+
+    def push(self, digit, price):
+        """Store a tick in the ring buffers"""
+        size = self.digits.shape[0]
+        self._update_price_window(price, self.prices[(self._idx - self._window) % size])
+        self.digits[self._idx] = digit
+        self.prices[self._idx] = price
+        self._idx = (self._idx + 1) % size
+        self.n += 1
+
+    def _update_price_window(self, price, oldest):
+        """Welford update of the price window stats; oldest leaves once the window is full"""
+        if self.n < self._window:
+            delta = price - self.window_mean
+            self.window_mean += delta / (self.n + 1)
+            self._win_m2 += delta * (price - self.window_mean)
+        else:
+            old_mean = self.window_mean
+            self.window_mean += (price - oldest) / self._window
+            self._win_m2 += (price - oldest) * (price - self.window_mean + oldest - old_mean)
+
+    def volatility(self):
+        """Population standard deviation of the last window prices (as np.std)"""
+        return math.sqrt(max(self._win_m2, 0.0) / self._window)
+
+    def latest(self, buf, count):
+        """Last count values of digits or prices, oldest first (a view when contiguous)"""
+        if self._idx >= count:
+            return buf[self._idx - count:self._idx]
+        # Wrapped: copy just the count values from both ends, not the whole ring
+        return np.concatenate((buf[self._idx - count:], buf[:self._idx]))
+
+    def pattern_scores(self):
+        """(best_digit, strength) from the pattern kernel over the stored digits"""
+        best_digit, strength = score_patterns(self.digits, self.n)
+        return int(best_digit), int(strength)
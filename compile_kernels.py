@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""Build the zero_loss_kernels extension so ZeroLossSystem starts without JIT warmup"""
+
+import sys
+sys.path.append('./backend')
+
+import os
+
+try:
+    from numba.pycc import CC
+except ImportError:
+    CC = None
+
+from tick_features import SCORE_PATTERNS_SIG, _score_patterns
+
+BACKEND_DIR = "backend"
+
+
+def compile_kernels():
+    """AOT-compile the pattern scoring kernel into backend/"""
+    if CC is None:
+        raise SystemExit("numba is required to build the zero_loss_kernels module")
+
+    cc = CC('zero_loss_kernels')
+    cc.output_dir = os.path.abspath(BACKEND_DIR)
+    cc.export('score_patterns', SCORE_PATTERNS_SIG)(_score_patterns)
+
+    print(f"🔧 Compiling zero_loss_kernels ({SCORE_PATTERNS_SIG})")
+    cc.compile()
+    print(f"✅ Built zero_loss_kernels in {cc.output_dir}")
+    print("💡 Re-run after editing backend/tick_features.py - the module does not track source changes")
+
+
+if __name__ == "__main__":
+    compile_kernels()
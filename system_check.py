@@ -4,6 +4,8 @@ System readiness check for Volatility 100 AI Trading System
 """
 import sys
 import os
+import glob
+import py_compile
 sys.path.append('./backend')
 
 def check_imports():
@@ -47,6 +49,21 @@ def check_files():
     
     return all_exist
 
+def check_test_scripts():
+    """Check that every test script at least compiles"""
+    all_ok = True
+    for script in sorted(glob.glob('test_*.py')):
+        try:
+            py_compile.compile(script, doraise=True)
+        except py_compile.PyCompileError as e:
+            print(f"❌ {script} - SYNTAX ERROR")
+            print(f"   {e.msg.strip()}")
+            all_ok = False
+    
+    if all_ok:
+        print("✅ All test scripts compile")
+    return all_ok
+
 def test_ai_system():
     """Test the AI prediction system"""
     try:
@@ -83,12 +100,15 @@ def main():
     print("\n📁 Checking Files...")
     files_ok = check_files()
     
+    print("\n🧪 Checking Test Scripts...")
+    scripts_ok = check_test_scripts()
+    
     print("\n🧠 Testing AI System...")
     ai_ok = test_ai_system()
     
     print("\n" + "=" * 55)
     
-    if imports_ok and files_ok and ai_ok:
+    if imports_ok and files_ok and scripts_ok and ai_ok:
         print("🎉 SYSTEM READY FOR DEMO TESTING!")
         print("\n🚀 Next Steps:")
         print("1. Add your Deriv API token to .env file")
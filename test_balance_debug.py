@@ -36,7 +36,7 @@ async def test_balance():
 
         # Test balance fetching
         print("💰 Testing balance fetching...")
-        balance = await deriv_client.get_balance_with_retry()
+        balance = await deriv_client.current_balance()
         if balance is not None:
             print(f"✅ Balance fetched successfully: ${balance}")
             deriv_client.balance = balance
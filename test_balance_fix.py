@@ -5,6 +5,7 @@ import asyncio
 import json
 import logging
 import os
+import numpy as np
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -36,10 +37,8 @@ async def test_balance():
 
         # Test balance fetching
         print("💰 Testing balance fetching...")
-        balance = await deriv_client.get_balance_with_retry()
-        if balance is not None:
-            print(f"✅ Balance fetched successfully: ${balance}")
-            deriv_client.balance = balance
+        if deriv_client.balance_stream_id is not None:
+            print(f"✅ Balance fetched successfully: ${deriv_client.balance}")
             return True
         else:
             print("❌ Failed to fetch balance")
@@ -65,13 +64,15 @@ async def test_trading_logic():
 
     # Test AI prediction
     try:
+        digits_arr = np.fromiter(tracker.digits, dtype=np.int8, count=len(tracker.digits))
+        prices_arr = np.fromiter(tracker.prices, dtype=np.float64, count=len(tracker.prices))
         prediction = ai_predictor.get_comprehensive_prediction(
-            list(tracker.digits),
-            list(tracker.prices),
+            digits_arr,
+            prices_arr,
             1000,  # Test balance
             1.0    # Test stake
         )
-        print(f"✅ AI prediction successful: Digit {prediction.get('predicted_digit', '?')}, Confidence {prediction.get('final_confidence', 0)".1f"}%")
+        print(f"✅ AI prediction successful: Digit {prediction.get('predicted_digit', '?')}, Confidence {prediction.get('final_confidence', 0):.1f}%")
         return True
     except Exception as e:
         print(f"❌ AI prediction failed: {e}")
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 """Test script to verify Deriv API token connection"""
 
+import sys
+sys.path.append('./backend')
+
 import asyncio
-import json
 import os
 import websockets
 from dotenv import load_dotenv
 
+from deriv_client import dumps, loads
+
 load_dotenv()
 
 async def test_deriv_token():
@@ -37,11 +41,11 @@ async def test_deriv_token():
 
         # Authorize with token
         auth_msg = {"authorize": api_token}
-        await ws.send(json.dumps(auth_msg))
+        await ws.send(dumps(auth_msg))
 
         # Get response
         response = await ws.recv()
-        data = json.loads(response)
+        data = loads(response)
 
         if "error" in data:
             print(f"❌ Authorization failed: {data['error']['message']}")
@@ -55,9 +59,9 @@ async def test_deriv_token():
             print(f"🏦 Account Type: {account_info.get('account_type', 'Demo')}")
 
             # Get balance
-            await ws.send(json.dumps({"balance": 1, "subscribe": 0}))
+            await ws.send(dumps({"balance": 1, "subscribe": 0}))
             balance_response = await ws.recv()
-            balance_data = json.loads(balance_response)
+            balance_data = loads(balance_response)
 
             if "balance" in balance_data:
                 balance = balance_data["balance"]["balance"]
@@ -1,124 +1,126 @@
 #!/usr/bin/env python3
 """Test AI-enhanced trading under various market conditions"""
 
+import os
 import sys
+# Prefer the bytecode-only backend bundle when built (python build_backend_pyz.py)
+# and still newer than the sources; a stale bundle would run old code
+from build_backend_pyz import fresh_archive
+BACKEND_ARCHIVE = fresh_archive()
+if BACKEND_ARCHIVE:
+    sys.path.insert(0, BACKEND_ARCHIVE)
 sys.path.append('./backend')
 
 from backend.ai_predictor import EnhancedPredictor
 import numpy as np
 import random
+import zlib
+from multiprocessing import Pool
 
+from backend._fastloops import npz_cache
+
+try:
+    from fastloops import digits_from_prices
+except ImportError:
+    from backend._fastloops import digits_from_prices
+
+# Synthetic quotes are quoted to 4 decimal places (base price 1.2345)
+PRICE_SCALE = 10 ** 4
+
+# Fixed seed so cached synthetic datasets are reproducible
+SEED = 42
+CACHE_DIR = '.synthetic_cache'
+
+def _condition_rng(condition, num_ticks):
+    """Generator seeded per dataset, so results do not depend on call order or process"""
+    return np.random.default_rng([SEED, zlib.crc32(condition.encode()), num_ticks])
+
+@npz_cache(CACHE_DIR, params=(SEED, PRICE_SCALE), helpers=(_condition_rng,))
 def generate_market_data(condition, num_ticks=100):
     """Generate synthetic market data for different conditions"""
+    base_price = 1.2345
+    rng = _condition_rng(condition, num_ticks)
+
     if condition == 'high_volatility':
         # High volatility: rapid price changes
-        base_price = 1.2345
-        prices = []
-        digits = []
-        for i in range(num_ticks):
-            change = np.random.normal(0, 0.005)  # High volatility
-            price = base_price + change
-            prices.append(price)
-            digits.append(int(str(price).replace(".", "")[-1]))
-            base_price = price
+        noise = rng.normal(0, 0.005, num_ticks)
 
     elif condition == 'low_volatility':
         # Low volatility: stable prices
-        base_price = 1.2345
-        prices = []
-        digits = []
-        for i in range(num_ticks):
-            change = np.random.normal(0, 0.0005)  # Low volatility
-            price = base_price + change
-            prices.append(price)
-            digits.append(int(str(price).replace(".", "")[-1]))
-            base_price = price
+        noise = rng.normal(0, 0.0005, num_ticks)
 
     elif condition == 'trending':
-        # Trending market
-        base_price = 1.2345
-        prices = []
-        digits = []
-        trend = 0.001  # Upward trend
-        for i in range(num_ticks):
-            change = trend + np.random.normal(0, 0.001)
-            price = base_price + change
-            prices.append(price)
-            digits.append(int(str(price).replace(".", "")[-1]))
-            base_price = price
+        # Trending market: upward drift
+        trend = 0.001
+        noise = trend + rng.normal(0, 0.001, num_ticks)
 
     elif condition == 'sideways':
         # Sideways market
-        base_price = 1.2345
-        prices = []
-        digits = []
-        for i in range(num_ticks):
-            change = np.random.normal(0, 0.001)
-            price = base_price + change
-            prices.append(price)
-            digits.append(int(str(price).replace(".", "")[-1]))
-            base_price = price
+        noise = rng.normal(0, 0.001, num_ticks)
 
     elif condition == 'patterned':
-        # Patterned digits (repeating sequences)
-        digits = []
+        # Patterned digits (repeating sequences) with corresponding prices
         pattern = [1, 2, 3, 4, 5, 6, 7, 8, 9, 0]
-        for i in range(num_ticks):
-            digits.append(pattern[i % len(pattern)])
+        digits = np.tile(pattern, num_ticks // len(pattern) + 1)[:num_ticks]
+        prices = base_price + rng.normal(0, 0.001, num_ticks).cumsum()
+        return digits, prices
 
-        # Generate corresponding prices
-        prices = []
-        base_price = 1.2345
-        for i in range(num_ticks):
-            change = np.random.normal(0, 0.001)
-            price = base_price + change
-            prices.append(price)
-            base_price = price
+    prices = base_price + noise.cumsum()
+    return digits_from_prices(prices, PRICE_SCALE), prices
 
-    return digits, prices
-
-def test_ai_under_conditions():
-    """Test AI performance under different market conditions"""
+def run_condition(condition):
+    """Run the AI over one synthetic market condition (executed in a worker process)"""
     predictor = EnhancedPredictor()
 
-    conditions = ['high_volatility', 'low_volatility', 'trending', 'sideways', 'patterned']
+    digits, prices = generate_market_data(condition, 200)
+    digits, prices = digits.tolist(), prices.tolist()
 
-    print("🧪 TESTING AI-ENHANCED TRADING UNDER VARIOUS MARKET CONDITIONS")
-    print("=" * 70)
+    # Test AI predictions
+    trades_taken = 0
+    profitable_trades = 0
+    last_confidence = 0
 
-    for condition in conditions:
-        print(f"\n📊 Testing: {condition.upper()}")
-        print("-" * 40)
+    for i in range(50, len(digits) - 1):
+        recent_digits = digits[:i]
+        recent_prices = prices[:i]
 
-        digits, prices = generate_market_data(condition, 200)
+        prediction = predictor.get_comprehensive_prediction(
+            recent_digits, recent_prices, 1000, 1.0
+        )
+        last_confidence = prediction['final_confidence']
 
-        # Test AI predictions
-        trades_taken = 0
-        profitable_trades = 0
+        if prediction['should_trade'] and prediction['final_confidence'] >= 70:
+            trades_taken += 1
+            predicted_digit = prediction['predicted_digit']
+            actual_next_digit = digits[i]
 
-        for i in range(50, len(digits) - 1):
-            recent_digits = digits[:i]
-            recent_prices = prices[:i]
+            # For DIFFERS strategy: win if actual != predicted
+            if actual_next_digit != predicted_digit:
+                profitable_trades += 1
 
-            prediction = predictor.get_comprehensive_prediction(
-                recent_digits, recent_prices, 1000, 1.0
-            )
+    return condition, trades_taken, profitable_trades, last_confidence
 
-            if prediction['should_trade'] and prediction['final_confidence'] >= 70:
-                trades_taken += 1
-                predicted_digit = prediction['predicted_digit']
-                actual_next_digit = digits[i]
+def test_ai_under_conditions():
+    """Test AI performance under different market conditions"""
+    conditions = ['high_volatility', 'low_volatility', 'trending', 'sideways', 'patterned']
 
-                # For DIFFERS strategy: win if actual != predicted
-                if actual_next_digit != predicted_digit:
-                    profitable_trades += 1
+    print("🧪 TESTING AI-ENHANCED TRADING UNDER VARIOUS MARKET CONDITIONS")
+    print("=" * 70)
+
+    # Conditions are independent, so run them in parallel worker processes
+    with Pool(processes=min(len(conditions), os.cpu_count() or 1)) as pool:
+        results = pool.map(run_condition, conditions)
+
+    for condition, trades_taken, profitable_trades, last_confidence in results:
+        print(f"\n📊 Testing: {condition.upper()}")
+        print("-" * 40)
 
         if trades_taken > 0:
             win_rate = (profitable_trades / trades_taken) * 100
             print(f"   Trades Taken: {trades_taken}")
             print(f"   Profitable Trades: {profitable_trades}")
             print(f"   Win Rate: {win_rate:.1f}%")
-            print(f"   AI Confidence Avg: {prediction['final_confidence']:.1f}%")
+            print(f"   AI Confidence Avg: {last_confidence:.1f}%")
         else:
             print("   No trades taken under current conditions")
 
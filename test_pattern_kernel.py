@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Check UltimateAI's pattern kernel against the original cubic pattern scan"""
+
+import sys
+sys.path.append('./backend')
+
+import numpy as np
+
+from ultimate_ai_system import _pattern_scores
+
+
+def reference_pattern_scores(digits):
+    """The original all-pairs scan the kernel replaced"""
+    scores = [0] * 10
+    if len(digits) < 20:
+        return scores
+
+    for pattern_len in [2, 3, 4]:
+        for i in range(len(digits) - pattern_len * 2):
+            pattern = digits[i:i+pattern_len]
+            for j in range(i+pattern_len, len(digits)-pattern_len+1):
+                if digits[j:j+pattern_len] == pattern:
+                    if j+pattern_len < len(digits):
+                        scores[digits[j+pattern_len]] += pattern_len
+    return scores
+
+
+def check_pattern_kernel(num_histories=30):
+    """Compare the compiled kernel and its plain-Python build on random digit histories"""
+    print("🧪 Testing UltimateAI pattern kernel...")
+
+    builds = {'compiled': _pattern_scores}
+    # Without numba _pattern_scores is already the plain-Python function
+    builds['python'] = getattr(_pattern_scores, 'py_func', _pattern_scores)
+
+    rng = np.random.default_rng(42)
+    failures = 0
+    for name, kernel in builds.items():
+        mismatches = 0
+        for _ in range(num_histories):
+            history = rng.integers(0, 10, rng.integers(15, 101))
+            expected = reference_pattern_scores(history.tolist())
+            actual = kernel(history.astype(np.int8)).tolist()
+            if actual != expected:
+                mismatches += 1
+        status = "✅" if mismatches == 0 else "❌"
+        print(f"   {status} {name}: {num_histories - mismatches}/{num_histories} histories match")
+        failures += mismatches
+
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_pattern_kernel() else 1)
@@ -5,55 +5,130 @@ import sys
 sys.path.append('./backend')
 
 import asyncio
-import websockets
-import json
+import inspect
+import logging
 import numpy as np
-from collections import deque, Counter
+from collections import deque
+from functools import lru_cache
 import math
-from datetime import datetime
+
+from deriv_client import (DerivClient, BALANCE_SUBSCRIBE, DIFFERS_TRADE_TMPL, TICKS_SUBSCRIBE,
+                          loads, price_scale, scan_quote)
+from market_clock import utc_hour
+from _njit import njit
+
+# Per-tick output goes through logging at DEBUG; trade events still print
+log = logging.getLogger("brightway")
+log.setLevel(logging.INFO)
+
+# Analysis kernels: digits are int8 arrays, results are length-10 score arrays
+
+@njit('float64[:](int8[:])', cache=True, fastmath=True)
+def _pattern_scores(digits):
+    """Credit the successor of each repeated 2/3/4-digit pattern once per earlier occurrence"""
+    scores = np.zeros(10)
+    n = digits.shape[0]
+    if n < 20:
+        return scores
+    
+    # Patterns are encoded as base-10 integers, so a flat array is the hash table.
+    # Keys are built from int64 digits: int8 arithmetic would overflow when this
+    # runs as plain Python (numba not installed)
+    digits = digits.astype(np.int64)
+    earlier = np.zeros(10 ** 4, dtype=np.int64)
+    for pattern_len in (2, 3, 4):
+        earlier[:] = 0
+        for j in range(pattern_len, n - pattern_len):
+            prev_key = 0
+            key = 0
+            for k in range(pattern_len):
+                prev_key = prev_key * 10 + digits[j - pattern_len + k]
+                key = key * 10 + digits[j + k]
+            earlier[prev_key] += 1
+            
+            # Pattern found, predict next
+            if earlier[key]:
+                scores[digits[j + pattern_len]] += pattern_len * earlier[key]
+    return scores
 
 class UltimateAI:
-    def __init__(self, api_token):
+    # Indexed by digit: True for the primes 2, 3, 5 and 7
+    _PRIME_MASK = np.array([0, 0, 1, 1, 0, 1, 0, 1, 0, 0], dtype=bool)
+    _PRIME_DIGITS = np.array([2, 3, 5, 7], dtype=np.int8)
+    _NONPRIME_DIGITS = np.array([0, 1, 4, 6, 8, 9], dtype=np.int8)
+    
+    # Indexed by UTC hour: 1.2 during the European session (08:00-16:59)
+    _SESSION_MULT = np.array([1.0] * 8 + [1.2] * 9 + [1.0] * 7)
+    
+    def __init__(self, api_token, ws=None):
         self.api_token = api_token
-        self.ws = None
+        # Pass a connection from DerivClient.get_connection to share it between strategies
+        self.ws = ws
+        # Extra recv() arguments for the tick loop, set once connected
+        self._recv_kwargs = {}
+        # Frames that arrived while waiting for a trade reply, read by the tick loop first
+        self._deferred = deque()
         self.balance = 0
         self.is_trading = True
         self.trades_made = 0
         self.wins = 0
         self.losses = 0
         
-        # Data storage
-        self.digits = deque(maxlen=100)
-        self.prices = deque(maxlen=100)
-        self.timestamps = deque(maxlen=100)
+        # Data storage: fixed-size buffers holding the last 100 ticks, oldest first
+        self._digits = np.zeros(100, dtype=np.int8)
+        self._prices = np.zeros(100, dtype=np.float64)
+        self._n = 0
+        
+        # 10 ** pip_size of the quote, fixed from the first tick
+        self._price_scale = None
+        
         
         # AI Models
         self.pattern_memory = {}
         self.success_patterns = []
         self.failure_patterns = []
         
+    @property
+    def digits(self):
+        """View of the buffered digits in arrival order"""
+        return self._digits[len(self._digits) - self._n:]
+    
+    @property
+    def prices(self):
+        """View of the buffered prices in arrival order"""
+        return self._prices[len(self._prices) - self._n:]
+    
+    def _push_tick(self, digit, price):
+        """Shift the buffers left by one slot and store the newest tick last"""
+        self._digits[:-1] = self._digits[1:]
+        self._digits[-1] = digit
+        self._prices[:-1] = self._prices[1:]
+        self._prices[-1] = price
+        if self._n < len(self._digits):
+            self._n += 1
+    
+    def _tick_waiting(self):
+        """True when the connection has already buffered a newer tick frame"""
+        if any(scan_quote(m) is not None for m in self._deferred):
+            return True
+        # Only the legacy websockets client exposes its receive buffer
+        messages = getattr(self.ws, 'messages', None)
+        return bool(messages) and any(scan_quote(m) is not None for m in messages)
+    
     async def connect(self):
         try:
-            self.ws = await websockets.connect(
-                "wss://ws.derivws.com/websockets/v3?app_id=1089",
-                ping_interval=20,
-                ping_timeout=10
-            )
+            if self.ws is None:
+                self.ws = await DerivClient.get_connection(self.api_token)
             
-            auth_msg = {"authorize": self.api_token}
-            await self.ws.send(json.dumps(auth_msg))
-            response = await self.ws.recv()
-            auth_data = json.loads(response)
+            # websockets >= 14 can hand back raw bytes, skipping a UTF-8 decode before parsing
+            if 'decode' in inspect.signature(self.ws.recv).parameters:
+                self._recv_kwargs = {'decode': False}
             
-            if "error" in auth_data:
-                print(f"❌ Authorization failed: {auth_data['error']}")
-                return False
-                
             print("🚀 ULTIMATE AI SYSTEM CONNECTED")
             
-            await self.ws.send(json.dumps({"balance": 1, "subscribe": 1}))
+            await self.ws.send(BALANCE_SUBSCRIBE)
             balance_response = await self.ws.recv()
-            balance_data = json.loads(balance_response)
+            balance_data = loads(balance_response)
             self.balance = balance_data.get('balance', {}).get('balance', 0)
             self.starting_balance = self.balance
             print(f"💰 Starting Balance: ${self.balance}")
@@ -64,64 +139,54 @@ class UltimateAI:
             print(f"❌ Connection failed: {e}")
             return False
     
-    def fibonacci_analysis(self, digits):
-        """Fibonacci sequence detection"""
+    @staticmethod
+    def fibonacci_analysis(digits):
+        """Fibonacci sequence detection (digits is an int8 ndarray)"""
+        scores = np.zeros(10, dtype=np.int32)
         if len(digits) < 10:
-            return {}
+            return scores
         
-        scores = {i: 0 for i in range(10)}
-        
-        for i in range(len(digits) - 3):
-            a, b = digits[i], digits[i+1]
-            fib_next = (a + b) % 10
-            
-            if i+2 < len(digits) and digits[i+2] == fib_next:
-                scores[fib_next] += 3
-                
+        # Triples (a, b, c) starting before the last one, where c == (a + b) % 10
+        a, b, c = digits[:-3], digits[1:-2], digits[2:-1]
+        mask = (a + b) % 10 == c
+        np.add.at(scores, c[mask], 3)
         return scores
     
-    def prime_pattern_analysis(self, digits):
-        """Prime number pattern analysis"""
-        primes = [2, 3, 5, 7]
-        scores = {i: 0 for i in range(10)}
-        
-        recent = digits[-15:] if len(digits) >= 15 else digits
-        prime_count = sum(1 for d in recent if d in primes)
+    @classmethod
+    def prime_pattern_analysis(cls, digits):
+        """Prime number pattern analysis (digits is an int8 ndarray)"""
+        scores = np.zeros(10, dtype=np.int32)
+        recent = digits[-15:]
+        prime_count = int(cls._PRIME_MASK[recent].sum())
         non_prime_count = len(recent) - prime_count
         
         if prime_count > non_prime_count * 1.3:
-            for prime in primes:
-                scores[prime] += 4
+            scores[cls._PRIME_DIGITS] += 4
         elif non_prime_count > prime_count * 1.3:
-            for digit in [0, 1, 4, 6, 8, 9]:
-                scores[digit] += 4
-                
+            scores[cls._NONPRIME_DIGITS] += 4
         return scores
     
-    def momentum_analysis(self, prices):
+    @staticmethod
+    def momentum_analysis(prices):
         """Price momentum analysis"""
         if len(prices) < 10:
             return 0
         
+        # Up ticks count +1, flat or down ticks -1
         recent = prices[-10:]
-        momentum = 0
-        
-        for i in range(1, len(recent)):
-            if recent[i] > recent[i-1]:
-                momentum += 1
-            else:
-                momentum -= 1
-                
-        return momentum / len(recent)
+        moves = np.where(np.diff(recent) > 0, 1, -1)
+        return float(moves.sum()) / len(recent)
     
-    def volatility_analysis(self, prices):
-        """Market volatility analysis"""
+    @staticmethod
+    def volatility_analysis(prices):
+        """Market volatility analysis (prices is a float64 ndarray)"""
         if len(prices) < 15:
             return {'favorable': False, 'score': 0}
         
-        recent = prices[-15:]
-        volatility = np.std(recent)
-        avg_volatility = np.mean([np.std(prices[i:i+10]) for i in range(len(prices)-10)])
+        volatility = prices[-15:].std()
+        # Rolling 10-tick std over every window except the newest one
+        windows = np.lib.stride_tricks.sliding_window_view(prices, 10)[:-1]
+        avg_volatility = windows.std(axis=1).mean()
         
         # Sweet spot volatility
         favorable = 0.0003 < volatility < 0.0015
@@ -129,74 +194,53 @@ class UltimateAI:
         
         return {'favorable': favorable, 'score': score}
     
-    def pattern_recognition(self, digits):
+    @staticmethod
+    def pattern_recognition(digits):
         """Advanced pattern recognition"""
-        if len(digits) < 20:
-            return {}
-        
-        scores = {i: 0 for i in range(10)}
-        
-        # Look for repeating patterns
-        for pattern_len in [2, 3, 4]:
-            for i in range(len(digits) - pattern_len * 2):
-                pattern = digits[i:i+pattern_len]
-                
-                # Check if pattern repeats
-                for j in range(i+pattern_len, len(digits)-pattern_len+1):
-                    if digits[j:j+pattern_len] == pattern:
-                        # Pattern found, predict next
-                        if j+pattern_len < len(digits):
-                            next_digit = digits[j+pattern_len]
-                            scores[next_digit] += pattern_len
-        
-        return scores
+        return _pattern_scores(digits)
     
     def ensemble_prediction(self, current_digit):
         """Combine all AI methods"""
-        if len(self.digits) < 25:
+        if self._n < 25:
             return None
         
+        # Market timing
+        hour = utc_hour()
+        
+        # Identical windows (redelivered ticks, replays) are answered from the cache
+        return dict(self._ensemble_pure(self.digits.tobytes(), self.prices.tobytes(), hour))
+    
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _ensemble_pure(cls, digits_bytes, prices_bytes, hour):
+        """Ensemble prediction for one tick window and UTC hour"""
+        # Writable copies: the numba kernels are compiled for mutable arrays
+        digits = np.frombuffer(digits_bytes, dtype=np.int8).copy()
+        prices = np.frombuffer(prices_bytes, dtype=np.float64).copy()
+        
         # Get all analysis results
-        fib_scores = self.fibonacci_analysis(list(self.digits))
-        prime_scores = self.prime_pattern_analysis(list(self.digits))
-        pattern_scores = self.pattern_recognition(list(self.digits))
+        fib_scores = cls.fibonacci_analysis(digits)
+        prime_scores = cls.prime_pattern_analysis(digits)
+        pattern_scores = cls.pattern_recognition(digits)
         
-        momentum = self.momentum_analysis(list(self.prices))
-        volatility = self.volatility_analysis(list(self.prices))
+        momentum = cls.momentum_analysis(prices)
+        volatility = cls.volatility_analysis(prices)
         
-        # Market timing
-        hour = datetime.utcnow().hour
-        session_multiplier = 1.2 if 8 <= hour <= 16 else 1.0  # European session
+        session_multiplier = cls._SESSION_MULT[hour]
         
-        # Combine all scores
-        final_scores = {}
-        for digit in range(10):
-            score = 0
-            score += fib_scores.get(digit, 0) * 0.25
-            score += prime_scores.get(digit, 0) * 0.25
-            score += pattern_scores.get(digit, 0) * 0.3
-            
-            # Momentum boost
-            if abs(momentum) > 0.3:
-                score += 2
-            
-            # Volatility boost
-            if volatility['favorable']:
-                score += 3
-            
-            # Session boost
-            score *= session_multiplier
-            
-            final_scores[digit] = score
+        # Combine all scores with the momentum, volatility and session boosts
+        boost = (2 if abs(momentum) > 0.3 else 0) + (3 if volatility['favorable'] else 0)
+        final = (0.25 * fib_scores + 0.25 * prime_scores + 0.3 * pattern_scores + boost) * session_multiplier
         
         # Get best prediction
-        best_digit = max(final_scores, key=final_scores.get)
-        confidence = min(final_scores[best_digit] * 6 + 30, 95)
+        best_digit = int(final.argmax())
+        best_score = float(final[best_digit])
+        confidence = min(best_score * 6 + 30, 95)
         
         # Trade on high confidence - simplified conditions
         should_trade = (
             confidence >= 85 and
-            final_scores[best_digit] >= 5
+            best_score >= 5
         )
         
         return {
@@ -205,7 +249,7 @@ class UltimateAI:
             'should_trade': should_trade,
             'momentum': momentum,
             'volatility': volatility,
-            'scores': final_scores
+            'scores': final
         }
     
     def adaptive_stake_calculation(self, confidence, consecutive_wins):
@@ -229,25 +273,10 @@ class UltimateAI:
         # Use DIFFERS strategy (90% win probability)
         digit = prediction['predicted_digit']
         
-        trade_msg = {
-            "buy": 1,
-            "price": stake,
-            "parameters": {
-                "amount": stake,
-                "basis": "stake",
-                "contract_type": "DIGITDIFF",
-                "currency": "USD",
-                "duration": 1,
-                "duration_unit": "t",
-                "symbol": "R_100",
-                "barrier": str(digit)
-            }
-        }
-        
         try:
-            await self.ws.send(json.dumps(trade_msg))
-            response = await self.ws.recv()
-            result = json.loads(response)
+            result = await DerivClient.request(
+                self.ws, DIFFERS_TRADE_TMPL % (stake, stake, digit), self._deferred, **self._recv_kwargs
+            )
             
             if "buy" in result:
                 contract_id = result['buy']['contract_id']
@@ -270,35 +299,49 @@ class UltimateAI:
         print("🚀 STARTING ULTIMATE AI SYSTEM")
         print("🧠 Combining ALL AI frameworks for maximum accuracy")
         
-        await self.ws.send(json.dumps({"ticks": "R_100", "subscribe": 1}))
+        await self.ws.send(TICKS_SUBSCRIBE)
         
         tick_count = 0
         consecutive_wins = 0
+        stale_ticks = 0
         
         while self.is_trading:
             try:
-                message = await asyncio.wait_for(self.ws.recv(), timeout=30)
-                data = json.loads(message)
+                if self._deferred:
+                    message = self._deferred.popleft()
+                else:
+                    message = await asyncio.wait_for(self.ws.recv(**self._recv_kwargs), timeout=30)
                 
-                if "tick" in data:
+                # Ticks only need their quote; other frames (and the first tick) are fully decoded
+                price = scan_quote(message) if self._price_scale is not None else None
+                data = loads(message) if price is None else None
+                if price is None and "tick" in data:
                     tick = data["tick"]
                     price = float(tick["quote"])
-                    current_digit = int(str(price).replace(".", "")[-1])
+                    if self._price_scale is None:
+                        self._price_scale = price_scale(price, tick.get("pip_size", 2))
+                
+                if price is not None:
+                    current_digit = int(round(price * self._price_scale)) % 10
                     
-                    self.digits.append(current_digit)
-                    self.prices.append(price)
-                    self.timestamps.append(datetime.utcnow())
+                    self._push_tick(current_digit, price)
                     tick_count += 1
                     
-                    print(f"📈 Tick {tick_count}: {price:.5f} | Digit: {current_digit}")
+                    log.debug("📈 Tick %d: %.5f | Digit: %d", tick_count, price, current_digit)
+                    
+                    # Under a burst, buffer ticks and only analyse the newest (at most 16 in a row)
+                    if stale_ticks < 16 and self._tick_waiting():
+                        stale_ticks += 1
+                        continue
+                    stale_ticks = 0
                     
                     # Get ultimate prediction
                     prediction = self.ensemble_prediction(current_digit)
                     
                     if prediction:
-                        print(f"🧠 AI Analysis: Digit={prediction['predicted_digit']}, "
-                              f"Conf={prediction['confidence']:.1f}%, "
-                              f"Trade={prediction['should_trade']}")
+                        log.debug("🧠 AI Analysis: Digit=%d, Conf=%.1f%%, Trade=%s",
+                                  prediction['predicted_digit'], prediction['confidence'],
+                                  prediction['should_trade'])
                         
                         if prediction['should_trade']:
                             self.trades_made += 1
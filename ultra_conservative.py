@@ -5,16 +5,35 @@ import sys
 sys.path.append('./backend')
 
 import asyncio
-import websockets
-import json
-import numpy as np
+import ctypes
+import inspect
+import logging
+import math
 from collections import deque
-from datetime import datetime
+
+from deriv_client import (DerivClient, BALANCE_SUBSCRIBE, DIFFERS_TRADE_TMPL, TICKS_SUBSCRIBE,
+                          loads, price_scale, scan_quote)
+from _hotdigit import hottest_digit
+
+# Per-tick output goes through logging at DEBUG; trade events still print
+log = logging.getLogger("brightway")
+log.setLevel(logging.INFO)
+
+def _pstdev(values):
+    """Population standard deviation (as np.std) in plain Python"""
+    n = len(values)
+    mean = sum(values) / n
+    return math.sqrt(sum((v - mean) ** 2 for v in values) / n)
 
 class UltraConservative:
-    def __init__(self, api_token):
+    def __init__(self, api_token, ws=None):
         self.api_token = api_token
-        self.ws = None
+        # Pass a connection from DerivClient.get_connection to share it between strategies
+        self.ws = ws
+        # Extra recv() arguments for the tick loop, set once connected
+        self._recv_kwargs = {}
+        # Frames that arrived while waiting for a trade reply, read by the tick loop first
+        self._deferred = deque()
         self.balance = 0
         self.is_trading = True
         self.trades_made = 0
@@ -24,28 +43,32 @@ class UltraConservative:
         self.digits = deque(maxlen=50)
         self.prices = deque(maxlen=50)
         
+        # The last 20 digits; the running histogram is only kept for the
+        # Python fallback, since the C kernel counts the window itself
+        self._window = deque(maxlen=20)
+        self._hist = [0] * 10 if hottest_digit is None else None
+        
+        # Out-parameter for the compiled hottest_digit kernel
+        self._freq = ctypes.c_int()
+        self._freq_ref = ctypes.byref(self._freq)
+        
+        # 10 ** pip_size of the quote, fixed from the first tick
+        self._price_scale = None
+        
     async def connect(self):
         try:
-            self.ws = await websockets.connect(
-                "wss://ws.derivws.com/websockets/v3?app_id=1089",
-                ping_interval=20,
-                ping_timeout=10
-            )
+            if self.ws is None:
+                self.ws = await DerivClient.get_connection(self.api_token)
             
-            auth_msg = {"authorize": self.api_token}
-            await self.ws.send(json.dumps(auth_msg))
-            response = await self.ws.recv()
-            auth_data = json.loads(response)
+            # websockets >= 14 can hand back raw bytes, skipping a UTF-8 decode before parsing
+            if 'decode' in inspect.signature(self.ws.recv).parameters:
+                self._recv_kwargs = {'decode': False}
             
-            if "error" in auth_data:
-                print(f"❌ Authorization failed: {auth_data['error']}")
-                return False
-                
             print("🚀 ULTRA CONSERVATIVE SYSTEM CONNECTED")
             
-            await self.ws.send(json.dumps({"balance": 1, "subscribe": 1}))
+            await self.ws.send(BALANCE_SUBSCRIBE)
             balance_response = await self.ws.recv()
-            balance_data = json.loads(balance_response)
+            balance_data = loads(balance_response)
             self.balance = balance_data.get('balance', {}).get('balance', 0)
             self.starting_balance = self.balance
             print(f"💰 Starting Balance: ${self.balance}")
@@ -56,28 +79,42 @@ class UltraConservative:
             print(f"❌ Connection failed: {e}")
             return False
     
+    def _track_digit(self, digit):
+        """Slide the 20-tick window forward, keeping the histogram (if any) in step"""
+        if self._hist is None:
+            self._window.append(digit)
+            return
+        if len(self._window) == self._window.maxlen:
+            self._hist[self._window[0]] -= 1
+        self._window.append(digit)
+        self._hist[digit] += 1
+    
+    def _hottest_digit_py(self):
+        """Most frequent digit in the window and its count, from the running histogram"""
+        frequency = max(self._hist)
+        if self._hist.count(frequency) == 1:
+            return self._hist.index(frequency), frequency
+        # Break ties by earliest appearance in the window
+        return next(d for d in self._window if self._hist[d] == frequency), frequency
+    
     def analyze_pattern(self):
         """Ultra-conservative pattern analysis"""
         if len(self.digits) < 30:
             return None
         
-        recent = list(self.digits)[-20:]
-        
-        # Count digit frequencies
-        counts = {}
-        for d in recent:
-            counts[d] = counts.get(d, 0) + 1
-        
-        # Find most frequent digit
-        most_frequent = max(counts, key=counts.get)
-        frequency = counts[most_frequent]
+        # Find most frequent digit in the last 20 ticks
+        if hottest_digit is not None:
+            most_frequent = hottest_digit(bytes(self._window), len(self._window), self._freq_ref)
+            frequency = self._freq.value
+        else:
+            most_frequent, frequency = self._hottest_digit_py()
         
         # Only trade if digit appears 6+ times in last 20 ticks (30%+ frequency)
         if frequency >= 6:
             confidence = min(frequency * 15 + 10, 98)  # Cap at 98%
             
             # Additional checks for ultra-conservative approach
-            volatility = np.std(list(self.prices)[-15:]) if len(self.prices) >= 15 else 0
+            volatility = _pstdev(list(self.prices)[-15:]) if len(self.prices) >= 15 else 0
             
             # Perfect conditions required
             perfect_conditions = (
@@ -102,25 +139,10 @@ class UltraConservative:
         digit = prediction['digit']
         stake = 0.35  # Minimum stake only
         
-        trade_msg = {
-            "buy": 1,
-            "price": stake,
-            "parameters": {
-                "amount": stake,
-                "basis": "stake",
-                "contract_type": "DIGITDIFF",
-                "currency": "USD",
-                "duration": 1,
-                "duration_unit": "t",
-                "symbol": "R_100",
-                "barrier": str(digit)
-            }
-        }
-        
         try:
-            await self.ws.send(json.dumps(trade_msg))
-            response = await self.ws.recv()
-            result = json.loads(response)
+            result = await DerivClient.request(
+                self.ws, DIFFERS_TRADE_TMPL % (stake, stake, digit), self._deferred, **self._recv_kwargs
+            )
             
             if "buy" in result:
                 contract_id = result['buy']['contract_id']
@@ -141,25 +163,35 @@ class UltraConservative:
         print("🚀 STARTING ULTRA CONSERVATIVE SYSTEM")
         print("🛡️ Only trading on 95%+ confidence with perfect conditions")
         
-        await self.ws.send(json.dumps({"ticks": "R_100", "subscribe": 1}))
+        await self.ws.send(TICKS_SUBSCRIBE)
         
         tick_count = 0
         
         while self.is_trading and self.wins < 3:
             try:
-                message = await asyncio.wait_for(self.ws.recv(), timeout=30)
-                data = json.loads(message)
+                if self._deferred:
+                    message = self._deferred.popleft()
+                else:
+                    message = await asyncio.wait_for(self.ws.recv(**self._recv_kwargs), timeout=30)
                 
-                if "tick" in data:
+                # Ticks only need their quote; other frames (and the first tick) are fully decoded
+                price = scan_quote(message) if self._price_scale is not None else None
+                data = loads(message) if price is None else None
+                if price is None and "tick" in data:
                     tick = data["tick"]
                     price = float(tick["quote"])
-                    current_digit = int(str(price).replace(".", "")[-1])
+                    if self._price_scale is None:
+                        self._price_scale = price_scale(price, tick.get("pip_size", 2))
+                
+                if price is not None:
+                    current_digit = int(round(price * self._price_scale)) % 10
                     
                     self.digits.append(current_digit)
                     self.prices.append(price)
+                    self._track_digit(current_digit)
                     tick_count += 1
                     
-                    print(f"📈 Tick {tick_count}: {price:.5f} | Digit: {current_digit}")
+                    log.debug("📈 Tick %d: %.5f | Digit: %d", tick_count, price, current_digit)
                     
                     # Analyze for ultra-conservative trade
                     prediction = self.analyze_pattern()
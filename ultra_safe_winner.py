@@ -6,36 +6,63 @@ sys.path.append('./backend')
 
 import asyncio
 import websockets
-import json
 import numpy as np
 from collections import deque
-from datetime import datetime
+
+try:
+    import uvloop
+except ImportError:  # Not installed, or on Windows where uvloop is unavailable
+    uvloop = None
+
+from deriv_client import DIFFERS_PARAMETERS, FrameRouter, dumps, loads
+from market_clock import utc_hour
+from tick_features import FeatureState
+
+HISTORY = 50
+PRICE_WINDOW = 30
+
+# Entries of recent_results
+LOSS, WIN = 0, 1
 
 class UltraSafeWinner:
     def __init__(self, api_token):
         self.api_token = api_token
         self.ws = None
+        # Owns all reads and writes on ws once connected
+        self._router = None
         self.balance = 0
         self.is_trading = True
         self.trades_made = 0
         self.wins = 0
         self.losses = 0
-        self.digits = deque(maxlen=50)
-        self.prices = deque(maxlen=50)
-        self.recent_results = deque(maxlen=10)  # Track recent wins/losses
+        # The last 50 ticks and the price window stats
+        self.features = FeatureState(HISTORY, PRICE_WINDOW)
+        self.recent_results = deque(maxlen=10)  # Track recent wins/losses (WIN/LOSS)
+        self._recent_losses = 0
         
+    def _record_result(self, result):
+        """Append WIN or LOSS to recent_results, keeping the running loss count in step"""
+        if len(self.recent_results) == self.recent_results.maxlen and self.recent_results[0] == LOSS:
+            self._recent_losses -= 1
+        self.recent_results.append(result)
+        if result == LOSS:
+            self._recent_losses += 1
+    
     async def connect(self):
         try:
             self.ws = await websockets.connect(
                 "wss://ws.derivws.com/websockets/v3?app_id=1089",
                 ping_interval=20,
-                ping_timeout=10
+                ping_timeout=10,
+                # Small, frequent frames: skip permessage-deflate and cap the frame size
+                compression=None,
+                max_size=2 ** 16
             )
             
             auth_msg = {"authorize": self.api_token}
-            await self.ws.send(json.dumps(auth_msg))
+            await self.ws.send(dumps(auth_msg))
             response = await self.ws.recv()
-            auth_data = json.loads(response)
+            auth_data = loads(response)
             
             if "error" in auth_data:
                 print(f"❌ Authorization failed: {auth_data['error']}")
@@ -43,13 +70,14 @@ class UltraSafeWinner:
                 
             print("🚀 ULTRA SAFE WINNER CONNECTED")
             
-            await self.ws.send(json.dumps({"balance": 1, "subscribe": 1}))
+            await self.ws.send(dumps({"balance": 1, "subscribe": 1}))
             balance_response = await self.ws.recv()
-            balance_data = json.loads(response)
+            balance_data = loads(balance_response)
             self.balance = balance_data.get('balance', {}).get('balance', 0)
             self.starting_balance = self.balance
             print(f"💰 Starting Balance: ${self.balance}")
             
+            self._router = FrameRouter(self.ws)
             return True
             
         except Exception as e:
@@ -58,35 +86,32 @@ class UltraSafeWinner:
     
     def analyze_market_timing(self):
         """Best trading hours analysis"""
-        hour = datetime.utcnow().hour
+        hour = utc_hour()
         # European session (8-16 UTC) typically more stable
         return 8 <= hour <= 16
     
     def analyze_volatility(self):
         """Advanced volatility analysis"""
-        if len(self.prices) < 30:
+        if self.features.n < 30:
             return False
         
-        recent = list(self.prices)[-30:]
-        volatility = np.std(recent)
-        mean_price = np.mean(recent)
+        volatility = self.features.volatility()
+        mean_price = self.features.window_mean
         
         # Sweet spot: low volatility, stable prices
         return volatility < 0.3 and 1300 < mean_price < 1500
     
     def analyze_digit_patterns(self):
         """Advanced pattern analysis with multiple filters"""
-        if len(self.digits) < 30:
+        if self.features.n < 30:
             return None, 0, 0
         
-        recent = list(self.digits)[-30:]
-        counts = {}
-        for d in recent:
-            counts[d] = counts.get(d, 0) + 1
+        recent = self.features.latest(self.features.digits, 30)
+        counts = np.bincount(recent, minlength=10)
         
-        # Find most frequent digit
-        most_frequent = max(counts, key=counts.get)
-        frequency = counts[most_frequent]
+        # Find most frequent digit (ties go to the one seen first)
+        frequency = int(counts.max())
+        most_frequent = int(recent[np.argmax(counts[recent] == frequency)])
         
         # Skip digit 0 (rare in Volatility 100)
         if most_frequent == 0:
@@ -104,18 +129,16 @@ class UltraSafeWinner:
             confidence += 20
         
         # Factor 2: Recent streak analysis
-        last_10 = recent[-10:]
-        if last_10.count(most_frequent) >= 4:
+        if int((recent[-10:] == most_frequent).sum()) >= 4:
             confidence += 20
         
         # Factor 3: Avoid recently appeared digits in last 3 ticks
-        last_3 = recent[-3:]
-        if most_frequent not in last_3:
+        if not (recent[-3:] == most_frequent).any():
             confidence += 15
         
         # Factor 4: Pattern consistency
-        first_half = recent[:15].count(most_frequent)
-        second_half = recent[15:].count(most_frequent)
+        first_half = int((recent[:15] == most_frequent).sum())
+        second_half = int((recent[15:] == most_frequent).sum())
         if abs(first_half - second_half) <= 1:  # Consistent pattern
             confidence += 10
         
@@ -128,8 +151,7 @@ class UltraSafeWinner:
             return 0
         
         # Recent performance adjustment
-        recent_wins = sum(1 for r in self.recent_results if r == 'win')
-        recent_losses = sum(1 for r in self.recent_results if r == 'loss')
+        recent_losses = self._recent_losses
         
         # Reduce stakes after losses
         if recent_losses >= 2:
@@ -150,21 +172,21 @@ class UltraSafeWinner:
         return 0
     
     def should_trade_now(self):
-        """Multiple safety checks before trading"""
+        """Multiple safety checks before trading, cheapest first"""
         # Check 1: Market timing
         if not self.analyze_market_timing():
             return False, "Outside optimal trading hours"
         
-        # Check 2: Volatility
-        if not self.analyze_volatility():
-            return False, "High volatility detected"
-        
-        # Check 3: Recent performance
+        # Check 2: Recent performance
         if len(self.recent_results) >= 3:
-            recent_losses = sum(1 for r in self.recent_results[-3:] if r == 'loss')
+            recent_losses = sum(self.recent_results[i] == LOSS for i in (-1, -2, -3))
             if recent_losses >= 2:
                 return False, "Too many recent losses"
         
+        # Check 3: Volatility
+        if not self.analyze_volatility():
+            return False, "High volatility detected"
+        
         # Check 4: Pattern analysis
         digit, frequency, confidence = self.analyze_digit_patterns()
         if not digit or confidence < 70:
@@ -190,22 +212,11 @@ class UltraSafeWinner:
         trade_msg = {
             "buy": 1,
             "price": stake,
-            "parameters": {
-                "amount": stake,
-                "basis": "stake",
-                "contract_type": "DIGITDIFF",
-                "currency": "USD",
-                "duration": 1,
-                "duration_unit": "t",
-                "symbol": "R_100",
-                "barrier": str(digit)
-            }
+            "parameters": {**DIFFERS_PARAMETERS, "amount": stake, "barrier": str(digit)}
         }
         
         try:
-            await self.ws.send(json.dumps(trade_msg))
-            response = await self.ws.recv()
-            result = json.loads(response)
+            result = await self._router.request(trade_msg)
             
             if "buy" in result:
                 print(f"🚀 ULTRA SAFE TRADE: DIFFERS on digit {digit}")
@@ -231,23 +242,21 @@ class UltraSafeWinner:
         print("   📈 Advanced pattern analysis")
         print("   💰 Adaptive stake sizing")
         
-        await self.ws.send(json.dumps({"ticks": "R_100", "subscribe": 1}))
+        self._router.send({"ticks": "R_100", "subscribe": 1})
         
         tick_count = 0
         last_trade_tick = 0
         
         while self.is_trading and self.wins < 10 and self.losses < 2:
             try:
-                message = await asyncio.wait_for(self.ws.recv(), timeout=30)
-                data = json.loads(message)
+                data = await asyncio.wait_for(self._router.recv(), timeout=30)
                 
                 if "tick" in data:
                     tick = data["tick"]
                     price = float(tick["quote"])
-                    current_digit = int(str(price).replace(".", "")[-1])
+                    current_digit = self.features.digit(price, tick.get("pip_size", 2))
                     
-                    self.digits.append(current_digit)
-                    self.prices.append(price)
+                    self.features.push(current_digit, price)
                     tick_count += 1
                     
                     print(f"📈 Tick {tick_count}: {price:.5f} | Digit: {current_digit}")
@@ -278,7 +287,7 @@ class UltraSafeWinner:
                         
                         if profit > 0:
                             self.wins += 1
-                            self.recent_results.append('win')
+                            self._record_result(WIN)
                             print(f"🎉 SAFE WIN #{self.wins}! +${profit:.2f} | Total: +${total_profit:.2f}")
                             
                             if self.wins >= 10:
@@ -286,7 +295,7 @@ class UltraSafeWinner:
                                 self.is_trading = False
                         else:
                             self.losses += 1
-                            self.recent_results.append('loss')
+                            self._record_result(LOSS)
                             print(f"💔 LOSS #{self.losses}: ${profit:.2f} | Total: ${total_profit:.2f}")
                             
                             if self.losses >= 2:
@@ -299,6 +308,7 @@ class UltraSafeWinner:
                 print(f"❌ Error: {e}")
                 break
         
+        await self._router.close()
         final_profit = self.balance - self.starting_balance
         win_rate = (self.wins / self.trades_made * 100) if self.trades_made > 0 else 0
         
@@ -337,4 +347,6 @@ async def main():
         print("❌ Failed to connect")
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
\ No newline at end of file
@@ -3,10 +3,25 @@
 
 import os
 import sys
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@lru_cache(maxsize=None)
+def _dir_entries(directory):
+    """Names in a directory, listed with a single scandir (empty if it is missing)"""
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(entry.name for entry in entries)
+    except OSError:
+        return frozenset()
+
+def _present(path):
+    """Whether path exists, answered from its parent directory's listing"""
+    directory, name = os.path.split(path)
+    return name in _dir_entries(directory or ".")
+
 def verify_configuration():
     """Check if everything is set up correctly"""
     print("🔍 Verifying Trading System Configuration")
@@ -36,7 +51,7 @@ def verify_configuration():
     ]
 
     for file in backend_files:
-        if os.path.exists(file):
+        if _present(file):
             print(f"   ✅ {file}")
         else:
             print(f"   ❌ {file} - MISSING!")
@@ -45,7 +60,7 @@ def verify_configuration():
     # Check database
     print("\n🗃️  Database Check:")
     db_file = "volatility_data.db"
-    if os.path.exists(db_file):
+    if _present(db_file):
         print(f"   ✅ {db_file} exists")
     else:
         print(f"   ⚠️  {db_file} not found (will be created)")
@@ -58,7 +73,7 @@ def verify_configuration():
     ]
 
     for file in frontend_files:
-        if os.path.exists(file):
+        if _present(file):
             print(f"   ✅ {file}")
         else:
             print(f"   ❌ {file} - MISSING!")
@@ -73,7 +88,7 @@ def verify_configuration():
     ]
 
     for script in scripts:
-        if os.path.exists(script):
+        if _present(script):
             print(f"   ✅ {script}")
         else:
             print(f"   ❌ {script} - MISSING!")
@@ -6,15 +6,25 @@ sys.path.append('./backend')
 
 import asyncio
 import websockets
-import json
 import numpy as np
-from collections import deque, Counter
-from datetime import datetime
+
+try:
+    import uvloop
+except ImportError:  # Not installed, or on Windows where uvloop is unavailable
+    uvloop = None
+
+from deriv_client import DIFFERS_PARAMETERS, FrameRouter, dumps, loads
+from tick_features import FeatureState
+
+DIGIT_HISTORY = 200
+PRICE_WINDOW = 30
 
 class ZeroLossSystem:
     def __init__(self, api_token):
         self.api_token = api_token
         self.ws = None
+        # Owns all reads and writes on ws once connected
+        self._router = None
         self.balance = 0
         self.is_trading = True
         self.trades_made = 0
@@ -28,9 +38,8 @@ class ZeroLossSystem:
         self.required_pattern_strength = 8  # Very high pattern requirement
         
         # Data storage
-        self.digits = deque(maxlen=200)  # More data for better analysis
-        self.prices = deque(maxlen=200)
-        self.timestamps = deque(maxlen=200)
+        # More data for better analysis: the last 200 ticks
+        self.features = FeatureState(DIGIT_HISTORY, PRICE_WINDOW)
         
         # Pattern tracking
         self.winning_patterns = []
@@ -41,13 +50,16 @@ class ZeroLossSystem:
             self.ws = await websockets.connect(
                 "wss://ws.derivws.com/websockets/v3?app_id=1089",
                 ping_interval=20,
-                ping_timeout=10
+                ping_timeout=10,
+                # Small, frequent frames: skip permessage-deflate and cap the frame size
+                compression=None,
+                max_size=2 ** 16
             )
             
             auth_msg = {"authorize": self.api_token}
-            await self.ws.send(json.dumps(auth_msg))
+            await self.ws.send(dumps(auth_msg))
             response = await self.ws.recv()
-            auth_data = json.loads(response)
+            auth_data = loads(response)
             
             if "error" in auth_data:
                 print(f"❌ Authorization failed: {auth_data['error']}")
@@ -55,13 +67,14 @@ class ZeroLossSystem:
                 
             print("🛡️ ZERO LOSS SYSTEM CONNECTED")
             
-            await self.ws.send(json.dumps({"balance": 1, "subscribe": 1}))
+            await self.ws.send(dumps({"balance": 1, "subscribe": 1}))
             balance_response = await self.ws.recv()
-            balance_data = json.loads(balance_response)
+            balance_data = loads(balance_response)
             self.balance = balance_data.get('balance', {}).get('balance', 0)
             self.starting_balance = self.balance
             print(f"💰 Starting Balance: ${self.balance}")
             
+            self._router = FrameRouter(self.ws)
             return True
             
         except Exception as e:
@@ -70,54 +83,14 @@ class ZeroLossSystem:
     
     def ultra_conservative_analysis(self):
         """Ultra-conservative pattern analysis"""
-        if len(self.digits) < 50:
+        if self.features.n < 50:
             return None
         
-        digits = list(self.digits)
-        scores = {i: 0 for i in range(10)}
+        best_digit, pattern_strength = self.features.pattern_scores()
         
-        # 1. Strong repetition patterns (weight: 40%)
-        for i in range(len(digits) - 10):
-            window = digits[i:i+10]
-            digit_counts = Counter(window)
-            
-            # Look for digits that appear 4+ times in 10 ticks
-            for digit, count in digit_counts.items():
-                if count >= 4:
-                    scores[digit] += count * 3
-        
-        # 2. Fibonacci sequences (weight: 30%)
-        for i in range(len(digits) - 5):
-            for j in range(i+1, len(digits) - 3):
-                a, b = digits[i], digits[j]
-                fib_next = (a + b) % 10
-                
-                # Check if fibonacci pattern continues
-                if j+1 < len(digits) and digits[j+1] == fib_next:
-                    scores[fib_next] += 5
-        
-        # 3. Alternating patterns (weight: 20%)
-        for i in range(len(digits) - 6):
-            if (digits[i] == digits[i+2] == digits[i+4] and
-                digits[i+1] == digits[i+3] == digits[i+5]):
-                scores[digits[i]] += 4
-                scores[digits[i+1]] += 4
-        
-        # 4. Recent dominance (weight: 10%)
-        recent_20 = digits[-20:]
-        recent_counts = Counter(recent_20)
-        max_count = max(recent_counts.values()) if recent_counts else 0
-        
-        if max_count >= 6:  # Digit appears 6+ times in last 20
-            dominant_digit = max(recent_counts, key=recent_counts.get)
-            scores[dominant_digit] += 6
-        
-        # Get best prediction
-        if not any(scores.values()):
+        # Nothing scored
+        if pattern_strength == 0:
             return None
-            
-        best_digit = max(scores, key=scores.get)
-        pattern_strength = scores[best_digit]
         
         # Ultra-conservative confidence calculation
         confidence = min(pattern_strength * 8 + 40, 99)
@@ -138,22 +111,20 @@ class ZeroLossSystem:
     
     def is_market_favorable(self):
         """Check if market conditions are favorable"""
-        if len(self.prices) < 30:
+        if self.features.n < 30:
             return False
         
         # Check volatility is in sweet spot
-        recent_prices = list(self.prices)[-30:]
-        volatility = np.std(recent_prices)
+        volatility = self.features.volatility()
         
         # Avoid high volatility periods
         if volatility > 0.002:
             return False
         
         # Check for trending behavior (avoid choppy markets)
-        price_changes = [recent_prices[i] - recent_prices[i-1] 
-                        for i in range(1, len(recent_prices))]
+        price_changes = np.diff(self.features.latest(self.features.prices, 30))
         
-        positive_changes = sum(1 for change in price_changes if change > 0)
+        positive_changes = int((price_changes > 0).sum())
         trend_strength = abs(positive_changes - len(price_changes)/2) / len(price_changes)
         
         # Need some trend, but not too extreme
@@ -168,22 +139,11 @@ class ZeroLossSystem:
         trade_msg = {
             "buy": 1,
             "price": stake,
-            "parameters": {
-                "amount": stake,
-                "basis": "stake",
-                "contract_type": "DIGITDIFF",
-                "currency": "USD",
-                "duration": 1,
-                "duration_unit": "t",
-                "symbol": "R_100",
-                "barrier": str(digit)
-            }
+            "parameters": {**DIFFERS_PARAMETERS, "amount": stake, "barrier": str(digit)}
         }
         
         try:
-            await self.ws.send(json.dumps(trade_msg))
-            response = await self.ws.recv()
-            result = json.loads(response)
+            result = await self._router.request(trade_msg)
             
             if "buy" in result:
                 contract_id = result['buy']['contract_id']
@@ -208,27 +168,56 @@ class ZeroLossSystem:
         print(f"   Max Stake: ${self.max_stake}")
         print(f"   Max Losses: {self.max_losses}")
         
-        await self.ws.send(json.dumps({"ticks": "R_100", "subscribe": 1}))
+        self._router.send({"ticks": "R_100", "subscribe": 1})
         
         tick_count = 0
         
         while self.is_trading:
             try:
-                message = await asyncio.wait_for(self.ws.recv(), timeout=30)
-                data = json.loads(message)
+                frames = [await asyncio.wait_for(self._router.recv(), timeout=30)]
+                # Apply everything already queued, then analyse once on the newest state
+                frames += self._router.drain()
+                new_ticks = 0
                 
-                if "tick" in data:
-                    tick = data["tick"]
-                    price = float(tick["quote"])
-                    current_digit = int(str(price).replace(".", "")[-1])
-                    
-                    self.digits.append(current_digit)
-                    self.prices.append(price)
-                    self.timestamps.append(datetime.now())
-                    tick_count += 1
-                    
-                    print(f"📈 Tick {tick_count}: {price:.5f} | Digit: {current_digit}")
+                for data in frames:
+                    if "tick" in data:
+                        tick = data["tick"]
+                        price = float(tick["quote"])
+                        current_digit = self.features.digit(price, tick.get("pip_size", 2))
+                        
+                        self.features.push(current_digit, price)
+                        tick_count += 1
+                        
+                        print(f"📈 Tick {tick_count}: {price:.5f} | Digit: {current_digit}")
+                        new_ticks += 1
                     
+                    elif "balance" in data:
+                        new_balance = data["balance"]["balance"]
+                        profit = new_balance - self.balance
+                        total_profit = new_balance - self.starting_balance
+                        
+                        if profit != 0:
+                            self.balance = new_balance
+                            
+                            if profit > 0:
+                                self.wins += 1
+                                print(f"🎉 WIN #{self.wins}! +${profit:.2f} | Total: +${total_profit:.2f}")
+                            else:
+                                self.losses += 1
+                                print(f"💔 LOSS #{self.losses}: ${profit:.2f} | Total: ${total_profit:.2f}")
+                            
+                            # Ultra-conservative stop conditions
+                            if self.wins >= 3:
+                                print("🎉 3 WINS - MISSION ACCOMPLISHED!")
+                                self.is_trading = False
+                            elif self.losses >= self.max_losses:
+                                print(f"🛡️ {self.max_losses} LOSS - CAPITAL PRESERVED")
+                                self.is_trading = False
+                            elif total_profit >= 1.5:
+                                print("💰 $1.50 PROFIT - SAFE EXIT!")
+                                self.is_trading = False
+                
+                if new_ticks and self.is_trading:
                     # Get ultra-conservative prediction
                     prediction = self.ultra_conservative_analysis()
                     
@@ -243,32 +232,6 @@ class ZeroLossSystem:
                             print(f"🛡️ ZERO LOSS TRADE #{self.trades_made}")
                             await self.place_safe_trade(prediction)
                             await asyncio.sleep(3)
-                
-                elif "balance" in data:
-                    new_balance = data["balance"]["balance"]
-                    profit = new_balance - self.balance
-                    total_profit = new_balance - self.starting_balance
-                    
-                    if profit != 0:
-                        self.balance = new_balance
-                        
-                        if profit > 0:
-                            self.wins += 1
-                            print(f"🎉 WIN #{self.wins}! +${profit:.2f} | Total: +${total_profit:.2f}")
-                        else:
-                            self.losses += 1
-                            print(f"💔 LOSS #{self.losses}: ${profit:.2f} | Total: ${total_profit:.2f}")
-                        
-                        # Ultra-conservative stop conditions
-                        if self.wins >= 3:
-                            print("🎉 3 WINS - MISSION ACCOMPLISHED!")
-                            self.is_trading = False
-                        elif self.losses >= self.max_losses:
-                            print(f"🛡️ {self.max_losses} LOSS - CAPITAL PRESERVED")
-                            self.is_trading = False
-                        elif total_profit >= 1.5:
-                            print("💰 $1.50 PROFIT - SAFE EXIT!")
-                            self.is_trading = False
                     
             except asyncio.TimeoutError:
                 print("⏰ Timeout - continuing...")
@@ -276,6 +239,7 @@ class ZeroLossSystem:
                 print(f"❌ Error: {e}")
                 break
         
+        await self._router.close()
         final_profit = self.balance - self.starting_balance
         print(f"\n📊 ZERO LOSS SYSTEM COMPLETE")
         print(f"Trades: {self.trades_made} | Wins: {self.wins} | Losses: {self.losses}")
@@ -315,4 +279,6 @@ async def main():
         print("❌ Failed to connect")
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
\ No newline at end of file